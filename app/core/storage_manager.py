@@ -79,6 +79,12 @@ class StorageManager:
         """Konvertiert relativen Pfad in absoluten lokalen Pfad"""
         return self.local_base_path / path
 
+    def local_path(self, path: str) -> Optional[Path]:
+        """Absoluter lokaler Pfad im LOCAL Modus (z.B. für Streaming-Parser), None im AZURE Modus"""
+        if self.mode == "AZURE":
+            return None
+        return self._get_local_path(path)
+
     def save_json(self, path: str, data: Union[Dict, List]) -> str:
         """Speichert Daten als JSON Datei"""
         try:
@@ -152,6 +158,41 @@ class StorageManager:
             logger.error(f"Fehler beim Laden von {path}: {e}")
             return None
 
+    def save_bytes(self, path: str, content: bytes) -> str:
+        """Speichert Rohdaten (bytes) in eine Datei, z.B. bereits serialisiertes JSON"""
+        try:
+            if self.mode == "AZURE":
+                blob_client = self.container_client.get_blob_client(path)
+                blob_client.upload_blob(content, overwrite=True)
+                return blob_client.url
+            else:
+                full_path = self._get_local_path(path)
+                full_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(full_path, 'wb') as f:
+                    f.write(content)
+                return str(full_path)
+        except Exception as e:
+            logger.error(f"Fehler beim Speichern von {path}: {e}")
+            raise
+
+    def load_bytes(self, path: str) -> Optional[bytes]:
+        """Lädt Rohdaten (bytes) aus einer Datei"""
+        try:
+            if self.mode == "AZURE":
+                blob_client = self.container_client.get_blob_client(path)
+                if not blob_client.exists():
+                    return None
+                return blob_client.download_blob().readall()
+            else:
+                full_path = self._get_local_path(path)
+                if not full_path.exists():
+                    return None
+                with open(full_path, 'rb') as f:
+                    return f.read()
+        except Exception as e:
+            logger.error(f"Fehler beim Laden von {path}: {e}")
+            return None
+
     def list_files(self, prefix: str = "") -> List[str]:
         """Listet Dateien in einem Verzeichnis (oder mit Prefix) auf"""
         files = []
@@ -80,9 +80,10 @@ def load_search_results(snapshot_id):
         raise FileNotFoundError(f"last_search_results.json not found for snapshot {snapshot_id}")
     return data
 
-def load_identify_response(snapshot_id):
-    """Load llm_identify_response.json from the latest iteration folder"""
-    iteration_number = get_latest_iteration_number(snapshot_id, require_file="llm_identify_response.json")
+def load_identify_response(snapshot_id, iteration_number=None):
+    """Load llm_identify_response.json from the latest iteration folder (or the given one)"""
+    if iteration_number is None:
+        iteration_number = get_latest_iteration_number(snapshot_id, require_file="llm_identify_response.json")
     if iteration_number is None:
         raise FileNotFoundError(f"No iteration folders with llm_identify_response.json found for {snapshot_id}")
     storage = get_storage()
@@ -785,7 +786,7 @@ def main():
     print("Loading inputs...")
     # AP7.0: identify_response first — it carries the authoritative tag_error_type that selects
     # the rulebook card. In monolith mode the argument is ignored.
-    identify_response = load_identify_response(snapshot_id)
+    identify_response = load_identify_response(snapshot_id, iteration_number)
     _analysis = identify_response.get("llm_analysis") or {}
     rulebook_error_type = _analysis.get("tag_error_type")
     # AP7.5: die Karten, die der Agent bei der Identifikation selbst als relevant benannt hat.
@@ -8,10 +8,25 @@ import os
 import re
 import subprocess
 import sys
+from collections import Counter
 from pathlib import Path
 from dotenv import load_dotenv
 from openai import AzureOpenAI
 
+# ijson ist optional: ohne das Paket wird die Validierungsdatei wie bisher komplett geladen
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+# pysimdjson ist optional: SIMD-Parser fuer Dateien unterhalb der Streaming-Schwelle
+try:
+    import simdjson
+    SIMDJSON_AVAILABLE = True
+except ImportError:
+    SIMDJSON_AVAILABLE = False
+
 # Storage Manager (LOCAL / AZURE)
 sys.path.insert(0, str(Path(__file__).parents[3]))
 from runtime_storage import get_storage, get_iteration_folders
@@ -24,6 +39,21 @@ from core.rulebook_loader import load_rulebook, card_index as rb_card_index
 env_path = Path(__file__).parents[3] / ".env"
 load_dotenv(dotenv_path=env_path)
 
+# Azure-OpenAI-Konfiguration: einmal beim Import gelesen, Pruefung in require_openai_config()
+_CFG_ENV_NAMES = {
+    "endpoint": "AZURE_OPENAI_ENDPOINT",
+    "api_key": "AZURE_OPENAI_API_KEY",
+    "api_version": "AZURE_OPENAI_API_VERSION",
+    "deployment": "AZURE_OPENAI_DEPLOYMENT",
+}
+_CFG = {key: os.getenv(name) for key, name in _CFG_ENV_NAMES.items()}
+
+# Ab dieser Dateigroesse wird snapshot-validation.json inkrementell geparst (nur LOCAL + ijson)
+VALIDATION_STREAMING_THRESHOLD_BYTES = 1024 * 1024
+
+# Obergrenze fuer die Anzahl (verschiedener) Fehler im Prompt, siehe compact_error_messages
+MAX_PROMPT_ERRORS = 50
+
 
 def load_validation_fix_rules():
     """
@@ -116,6 +146,50 @@ def load_validation_data(snapshot_id):
     return data
 
 
+def load_validation_errors(snapshot_id):
+    """
+    Load only the ERROR entries of snapshot-validation.json.
+
+    Downstream (analyze_validation_with_llm) only ever looks at level == 'ERROR'. For large
+    local files the JSON array is parsed incrementally with ijson and filtered on the fly,
+    so WARNING/INFO entries are never materialized. Small files, AZURE mode or a missing
+    ijson fall back to the full load. Locally that full load goes through pysimdjson when
+    installed: only the 'level' of each entry is read lazily, and only ERROR entries are
+    converted into Python dicts.
+    """
+    storage = get_storage()
+    path = None
+    if IJSON_AVAILABLE or SIMDJSON_AVAILABLE:
+        path = storage.local_path(f"{snapshot_id}/snapshot-validation.json")
+    if path is not None and path.exists():
+        if IJSON_AVAILABLE and path.stat().st_size >= VALIDATION_STREAMING_THRESHOLD_BYTES:
+            try:
+                with open(path, 'rb') as f:
+                    # Anything but a top-level array goes through the full load below
+                    first_event = next(ijson.parse(f), None)
+                    if first_event is not None and first_event[1] == 'start_array':
+                        f.seek(0)
+                        return [msg for msg in ijson.items(f, 'item', use_float=True) if msg.get('level') == 'ERROR']
+            except Exception as e:
+                # Truncated/invalid file: report it and take the full load below, which
+                # logs via storage.load_json and returns None as before
+                print(f"Warning: could not stream {snapshot_id}/snapshot-validation.json: {e}")
+        elif SIMDJSON_AVAILABLE:
+            try:
+                parser = simdjson.Parser()
+                doc = parser.parse(path.read_bytes())
+                # Anything but a top-level array goes through the full load below
+                if isinstance(doc, simdjson.Array):
+                    return [msg.as_dict() for msg in doc if msg.get('level') == 'ERROR']
+            except Exception as e:
+                print(f"Warning: could not parse {snapshot_id}/snapshot-validation.json with simdjson: {e}")
+
+    data = load_validation_data(snapshot_id)
+    if data is None:
+        return None
+    return [msg for msg in data if msg.get('level') == 'ERROR']
+
+
 def get_next_iteration_number(snapshot_id):
     """Find the highest iteration number and return next number"""
     nums = get_iteration_folders(snapshot_id)
@@ -146,14 +220,72 @@ def save_llm_response(snapshot_id, llm_response, first_error, llm_call_data):
     return iteration_dir, iteration_number
 
 
+def require_openai_config():
+    """Return the Azure OpenAI config or raise RuntimeError naming every missing env var."""
+    missing = [_CFG_ENV_NAMES[key] for key, value in _CFG.items() if not value]
+    if missing:
+        raise RuntimeError(f"Missing env var(s): {', '.join(missing)}")
+    return _CFG
+
+
+# Severity-Stichworte nach Abschnitt 0.1 der Fix-Regeln: leere/fehlende Felder sind meist
+# die Ursache, doppelte IDs kommen vor Referenz- und Wertfehlern
+_ROOT_CAUSE_KEYWORDS = ("empty", "missing", "must not be", "leer", "fehlt", "fehlend")
+_DUPLICATE_KEYWORDS = ("duplicate", "doppelt", "mehrfach")
+
+
+def _error_severity_rank(message):
+    """0 = root cause (empty/missing), 1 = duplicate, 2 = everything else."""
+    text = str(message).lower()
+    if any(keyword in text for keyword in _ROOT_CAUSE_KEYWORDS):
+        return 0
+    if any(keyword in text for keyword in _DUPLICATE_KEYWORDS):
+        return 1
+    return 2
+
+
+def compact_error_messages(error_messages, limit=MAX_PROMPT_ERRORS):
+    """
+    Bound the error list that goes into the prompt.
+
+    Up to `limit` errors are passed through unchanged. Above that, identical messages are
+    collapsed (each with its `count`) and the `limit` highest-priority ones are kept:
+    ranked by severity keyword (_error_severity_rank), then by frequency, then by first
+    occurrence. The first ERROR of the file always keeps a slot, so a rare blocking
+    error is never dropped from the prompt.
+
+    Returns (prompt_errors, source_errors): prompt_errors is what the LLM sees,
+    source_errors[i] is the original validation entry behind prompt_errors[i], so the
+    selected_error_index returned by the LLM can be resolved against it.
+    """
+    if len(error_messages) <= limit:
+        return error_messages, error_messages
+
+    counts = Counter(msg.get('message', '') for msg in error_messages)
+    first_by_message = {}
+    for msg in error_messages:
+        first_by_message.setdefault(msg.get('message', ''), msg)
+
+    # sorted() is stable and counts keeps first-occurrence order, which breaks ties
+    top = sorted(counts.items(), key=lambda item: (_error_severity_rank(item[0]), -item[1]))[:limit]
+    first_message = error_messages[0].get('message', '')
+    if all(message != first_message for message, _ in top):
+        top[-1] = (first_message, counts[first_message])
+
+    source_errors = [first_by_message[message] for message, _ in top]
+    prompt_errors = [{**msg, "count": count} for msg, (_, count) in zip(source_errors, top)]
+    return prompt_errors, source_errors
+
+
 def analyze_validation_with_llm(validation_data):
     """Use Azure OpenAI to analyze validation data and identify the first ERROR"""
     
     # Initialize Azure OpenAI client
+    cfg = require_openai_config()
     client = AzureOpenAI(
-        azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
-        api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-        api_version=os.getenv("AZURE_OPENAI_API_VERSION")
+        azure_endpoint=cfg["endpoint"],
+        api_key=cfg["api_key"],
+        api_version=cfg["api_version"]
     )
     
     # Filter for ERROR messages only
@@ -164,6 +296,13 @@ def analyze_validation_with_llm(validation_data):
         return None
     
     print(f"Found {len(error_messages)} ERROR message(s)")
+    prompt_errors, source_errors = compact_error_messages(error_messages)
+    if len(prompt_errors) < len(error_messages):
+        print(f"Prompt limited to the {len(prompt_errors)} highest-priority distinct ERRORs")
+        errors_heading = (f"Validation Errors ({len(error_messages)} total, showing the "
+                          f"{len(prompt_errors)} highest-priority distinct messages with their count)")
+    else:
+        errors_heading = f"ALL Validation Errors ({len(error_messages)} total)"
     print(f"Analyzing ALL ERRORs with LLM to prioritize...")
     
     # Load validation fix rules
@@ -186,8 +325,8 @@ def analyze_validation_with_llm(validation_data):
     prompt = f"""You are analyzing validation errors from a Smart Planning system. 
 Your task is to SELECT the MOST CRITICAL error to fix first and extract the relevant information.
 
-ALL Validation Errors ({len(error_messages)} total):
-{json.dumps(error_messages, indent=2)}
+{errors_heading}:
+{json.dumps(prompt_errors, separators=(',', ':'), ensure_ascii=False)}
 
 Please analyze ALL errors using the rules from Section 0 (Error Identification & Prioritization):
 1. Identify dependencies - does one error cause others?
@@ -229,23 +368,27 @@ Schluesselwoertern. Passt keine, gib eine leere Liste zurueck.
     
     system_message = "You are a helpful assistant that analyzes validation errors and extracts relevant information for investigation."
     
-    # Call Azure OpenAI
-    response = client.chat.completions.create(
-        model=os.getenv("AZURE_OPENAI_DEPLOYMENT"),
-        messages=[
+    # Request parameters are built once: the same dict (and thus the same prompt string)
+    # is passed to the API and referenced in llm_call_data below.
+    request_params = {
+        "model": cfg["deployment"],
+        "messages": [
             {"role": "system", "content": system_message},
             {"role": "user", "content": prompt}
         ],
-        temperature=0.3,
-        response_format={"type": "json_object"}
-    )
+        "temperature": 0.3,
+        "response_format": {"type": "json_object"}
+    }
+
+    # Call Azure OpenAI
+    response = client.chat.completions.create(**request_params)
     
     # Parse response
     llm_response = json.loads(response.choices[0].message.content)
     
     # Extract the selected error
     selected_index = llm_response.get('selected_error_index', 0)
-    selected_error = error_messages[selected_index] if selected_index < len(error_messages) else error_messages[0]
+    selected_error = source_errors[selected_index] if selected_index < len(source_errors) else source_errors[0]
 
     # AP3.6b-1: additively attach the tag-derived error type (reliable classifier from the
     # [validate_*] tag). The existing free-text `error_type` stays untouched next to it;
@@ -260,15 +403,7 @@ Schluesselwoertern. Passt keine, gib eine leere Liste zurueck.
 
     # Prepare full LLM call data for logging
     llm_call_data = {
-        "request": {
-            "model": os.getenv("AZURE_OPENAI_DEPLOYMENT"),
-            "messages": [
-                {"role": "system", "content": system_message},
-                {"role": "user", "content": prompt}
-            ],
-            "temperature": 0.3,
-            "response_format": {"type": "json_object"}
-        },
+        "request": request_params,
         "response": {
             "content": llm_response,
             "model": response.model,
@@ -381,13 +516,13 @@ def main():
         else:
             print(f"Using Snapshot ID from argument: {snapshot_id}\n")
     
-    # Step 2: Load validation data
+    # Step 2: Load validation data (nur ERROR-Eintraege, siehe load_validation_errors)
     if not demo_mode:
-        validation_data = load_validation_data(snapshot_id)
+        validation_data = load_validation_errors(snapshot_id)
         if validation_data is None:
             return
     
-    print(f"Validation data loaded: {len(validation_data)} message(s)\n")
+    print(f"Validation data loaded: {len(validation_data)} ERROR message(s)\n")
     
     # Step 3: Analyze with LLM
     result = analyze_validation_with_llm(validation_data)
@@ -4,9 +4,14 @@ Searches for specific values in snapshot-data.json to identify and analyze data.
 Reads the current snapshot ID from runtime-files/current_snapshot.txt.
 """
 
+import heapq
 import json
+import mmap
 import re
+import statistics
 import sys
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
 from typing import Any, List, Dict, Tuple
 
@@ -14,9 +19,172 @@ from typing import Any, List, Dict, Tuple
 sys.path.insert(0, str(Path(__file__).parents[3]))
 from runtime_storage import get_storage, get_latest_iteration_number as _get_latest_num
 
+# orjson ist optional (C-Parser/Serializer); ohne das Paket wird die stdlib json verwendet
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
-def load_snapshot_data(snapshot_id: str = None):
-    """Load snapshot data from current snapshot"""
+# ijson ist optional: ohne das Paket wird die Snapshot-Datei immer komplett geladen
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+# rapidfuzz ist optional (bit-paralleles Levenshtein in C); ohne das Paket rechnet die Python-DP
+try:
+    from rapidfuzz.distance import Levenshtein as RapidfuzzLevenshtein
+    RAPIDFUZZ_AVAILABLE = True
+except ImportError:
+    RAPIDFUZZ_AVAILABLE = False
+
+# numpy ist optional: vektorisierte Statistik fuer lange Wertelisten
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# numba ist optional: JIT-kompilierte Levenshtein-DP, falls rapidfuzz fehlt (braucht numpy)
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = NUMPY_AVAILABLE
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Ab dieser Dateigroesse werden nur die benoetigten Sektionen gestreamt (nur LOCAL + ijson)
+SNAPSHOT_STREAMING_THRESHOLD_BYTES = 1024 * 1024
+
+# Ab so vielen Werten rechnet summarize_values mit numpy statt in Python
+NUMPY_STATS_MIN_VALUES = 200
+
+# Array-Name und Index vor dem ersten "[" eines Ergebnispfads, z.B. "demands[1].articleId" -> ("demands", "1")
+ARRAY_PATH_RE = re.compile(r'^(?:[^\[]*\.)?([^.\[]*)\[([^\[\]]*)')
+
+
+# Set once a document had to be parsed by the stdlib json module (e.g. NaN/Infinity literals,
+# which orjson rejects). dump_json_bytes then serializes with the stdlib as well: orjson would
+# write such values as null and change the data the correction step sees.
+_stdlib_json_loaded = False
+
+
+def _load_json_stdlib(storage, path: str):
+    """storage.load_json, remembering that the document may hold non-finite floats"""
+    global _stdlib_json_loaded
+    _stdlib_json_loaded = True
+    return storage.load_json(path)
+
+
+def load_mapped_json(path: Path):
+    """Parse a non-empty local JSON file with orjson directly from a read-only memory map"""
+    with open(path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            with memoryview(mm) as view:
+                return orjson.loads(view)
+
+
+def load_json_fast(storage, path: str):
+    """
+    Load a JSON file via the storage manager, parsed with orjson when available.
+    Local files go through load_local_json (memory-mapped, cached per mtime/size).
+    """
+    local_path = storage.local_path(path)
+    if local_path is not None and local_path.is_file():
+        try:
+            return load_local_json(local_path)
+        except ValueError:
+            # Invalid JSON: the storage manager logs the error and returns None
+            return _load_json_stdlib(storage, path)
+    if not ORJSON_AVAILABLE:
+        return _load_json_stdlib(storage, path)
+    raw = storage.load_bytes(path)
+    if raw is None:
+        return None
+    try:
+        return orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        # e.g. NaN/Infinity literals, which only the stdlib parser accepts
+        return _load_json_stdlib(storage, path)
+
+
+def load_local_json(path: Path):
+    """
+    Read a local JSON file in one go, parsed with orjson (memory-mapped) when available.
+
+    Parsed documents are cached per (path, mtime, size), so repeated loads within one process
+    reuse the result until the file changes. The returned object is shared: do not mutate it.
+    """
+    stat = path.stat()
+    return _load_local_json_cached(str(path), stat.st_mtime_ns, stat.st_size)
+
+
+@lru_cache(maxsize=4)
+def _load_local_json_cached(path_str: str, mtime_ns: int, size: int):
+    global _stdlib_json_loaded
+    path = Path(path_str)
+    if ORJSON_AVAILABLE and size > 0:
+        try:
+            return load_mapped_json(path)
+        except orjson.JSONDecodeError:
+            pass
+    _stdlib_json_loaded = True
+    return json.loads(path.read_text(encoding='utf-8'))
+
+
+def dump_json_bytes(payload: Any) -> bytes:
+    """
+    Serialize like StorageManager.save_json (indent=2, UTF-8), with orjson when available.
+    Callers writing the same payload to several files serialize once and reuse the bytes.
+
+    orjson output is equivalent but not byte-identical for floats (1e16 / 0.00001 instead of
+    1e+16 / 1e-05). Once a document was loaded through the stdlib parser, the payload may
+    hold NaN/Infinity, which orjson would turn into null; the stdlib encoder is used then.
+    """
+    if ORJSON_AVAILABLE and not _stdlib_json_loaded:
+        try:
+            return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_INDENT_2)
+        except TypeError:
+            # e.g. integers beyond 64 bit, which only the stdlib encoder handles
+            pass
+    return json.dumps(payload, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+def load_snapshot_sections(storage, path: str, sections: List[str]):
+    """
+    Stream only the given top-level sections of a large local snapshot file with ijson.
+
+    Returns None when streaming does not apply (AZURE mode, no ijson, missing or small
+    file, input ijson cannot parse); the caller then loads the whole document as before.
+    """
+    if not IJSON_AVAILABLE:
+        return None
+    local_path = storage.local_path(path)
+    if local_path is None or not local_path.exists() or local_path.stat().st_size < SNAPSHOT_STREAMING_THRESHOLD_BYTES:
+        return None
+
+    data = {}
+    try:
+        with open(local_path, 'rb') as f:
+            for section in sections:
+                f.seek(0)
+                # Last occurrence wins, like json.load with duplicate keys
+                for value in ijson.items(f, section, use_float=True):
+                    data[section] = value
+    except ijson.JSONError:
+        # e.g. NaN/Infinity literals or a truncated file: the full load handles/reports it
+        return None
+    return data
+
+
+def load_snapshot_data(snapshot_id: str = None, sections: List[str] = None):
+    """
+    Load snapshot data from current snapshot.
+
+    With `sections`, callers that only need some top-level arrays (e.g. "equipment") get a
+    dict holding just those; large local files are then streamed instead of fully parsed.
+    """
     # 1. Snapshot-ID bestimmen: Argument hat Priorität, Fallback auf Datei
     if not snapshot_id:
         runtime_files_dir = Path(__file__).parent / "runtime-files"
@@ -27,8 +195,7 @@ def load_snapshot_data(snapshot_id: str = None):
             return None, None
         
         # Parse snapshot_id from file
-        with open(current_snapshot_file, 'r') as f:
-            content = f.read().strip()
+        content = current_snapshot_file.read_text().strip()
         if "snapshot_id = " in content:
             snapshot_id = content.split("snapshot_id = ")[1].strip()
         else:
@@ -37,7 +204,11 @@ def load_snapshot_data(snapshot_id: str = None):
     
     # Load snapshot-data.json from main folder (NOT from original-data)
     storage = get_storage()
-    data = storage.load_json(f"{snapshot_id}/snapshot-data.json")
+    data = None
+    if sections:
+        data = load_snapshot_sections(storage, f"{snapshot_id}/snapshot-data.json", sections)
+    if data is None:
+        data = load_json_fast(storage, f"{snapshot_id}/snapshot-data.json")
 
     if data is None:
         print(f"Error: {snapshot_id}/snapshot-data.json not found")
@@ -57,10 +228,7 @@ def load_reference_snapshot():
     
     print(f"  [i] Loading reference snapshot for fallback data...")
     
-    with open(reference_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    return data
+    return load_local_json(reference_file)
 
 
 def load_config():
@@ -72,8 +240,7 @@ def load_config():
         # Default: reference data fallback enabled
         return {"use_reference_data_fallback": True}
     
-    with open(config_file, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    return load_local_json(config_file)
 
 
 #: The valid work-item keys (ESAROM domain, KUNDENDOKUMENTATION.md §5.1). Anything in an
@@ -113,102 +280,178 @@ def find_equipment_workitem_anomalies(data: Dict, required_key: str = None) -> L
     return results
 
 
-def find_empty_arrays(data: Any, search_field: str) -> List[Dict]:
-    """Find empty arrays in snapshot data that match the search field name"""
+def render_path(base_path: Any, segments: List[Tuple[Any, bool]]) -> Any:
+    """
+    Render a traversal trail of (key, in_dict) segments to the "a.b[3].c" path format.
+    The walks keep the trail and only call this for matches.
+    """
+    current_path = base_path
+    for key, in_dict in segments:
+        current_path = (f"{current_path}.{key}" if current_path else key) if in_dict else f"{current_path}[{key}]"
+    return current_path
+
+
+def is_indexed_segment(text: str) -> bool:
+    """True for "<name>[<digits>]" with a non-empty name, e.g. "predecessors[0]" """
+    name, bracket, index = text[:-1].rpartition('[')
+    return text.endswith(']') and bool(bracket) and bool(name) and index.isdecimal()
+
+
+def nested_array_element_parent(path: str) -> Any:
+    """
+    Path of the object holding a nested array element, or None:
+    "equipment[0].predecessors[0]" -> "equipment[0]". Plain string splitting instead of
+    a regex match per result; the last "." separates the two indexed segments.
+    """
+    head, dot, tail = path.rpartition('.')
+    if dot and is_indexed_segment(tail) and is_indexed_segment(head):
+        return head
+    return None
+
+
+@lru_cache(maxsize=4096)
+def normalize_field_name(name: str) -> str:
+    """Normalize field name (remove spaces, lowercase); cached, the same keys repeat throughout a snapshot"""
+    return name.replace(" ", "").replace("_", "").lower()
+
+
+def find_empty_arrays(data: Any, search_field: str, first_only: bool = False) -> List[Dict]:
+    """
+    Find empty arrays in snapshot data that match the search field name.
+
+    Iterative depth-first walk over (container, child iterator) frames, same traversal
+    order as search_in_dict; the path is rendered from the trail only for matches.
+    With first_only, the walk stops at the first match (callers that only use [0]).
+    """
     results = []
-    
-    def normalize_field_name(name: str) -> str:
-        """Normalize field name (remove spaces, lowercase)"""
-        return name.replace(" ", "").replace("_", "").lower()
-    
     normalized_search = normalize_field_name(search_field)
-    
-    def search_recursive(obj: Any, path: str = ""):
-        """Recursively search for empty arrays"""
-        if isinstance(obj, dict):
-            for key, value in obj.items():
-                normalized_key = normalize_field_name(key)
-                current_path = f"{path}.{key}" if path else key
-                
-                # Check if this is an empty array and matches search field
-                if isinstance(value, list) and len(value) == 0:
-                    if normalized_key == normalized_search:
-                        results.append({
-                            "path": current_path,
-                            "field_name": key,
-                            "value": [],
-                            "is_empty_array": True
-                        })
-                
-                # Continue recursive search
-                search_recursive(value, current_path)
-        
-        elif isinstance(obj, list):
-            for idx, item in enumerate(obj):
-                current_path = f"{path}[{idx}]"
-                search_recursive(item, current_path)
-    
-    search_recursive(data)
+
+    if not isinstance(data, (dict, list)):
+        return results
+
+    # trail[i] is the segment under which stack[i + 1] was entered
+    trail = []
+    stack = [(data, iter(data.items()) if isinstance(data, dict) else enumerate(data))]
+    while stack:
+        parent, children = stack[-1]
+        is_dict = isinstance(parent, dict)
+        for key, value in children:
+            value_type = type(value)
+            # Check if this is an empty array and matches search field
+            if is_dict and value_type is list and len(value) == 0:
+                if normalize_field_name(key) == normalized_search:
+                    results.append({
+                        "path": render_path("", trail + [(key, True)]),
+                        "field_name": key,
+                        "value": [],
+                        "is_empty_array": True
+                    })
+                    if first_only:
+                        return results
+
+            # Continue with nested structures; the parent frame resumes afterwards
+            if value_type is dict or value_type is list:
+                trail.append((key, is_dict))
+                stack.append((value, iter(value.items()) if value_type is dict else enumerate(value)))
+                break
+        else:
+            stack.pop()
+            if trail:
+                trail.pop()
+
     return results
 
 
 def search_in_dict(obj: Any, search_value: str, path: str = "") -> List[Dict]:
-    """Recursively search for a value in nested dictionary/list structures"""
+    """
+    Search for a value in nested dictionary/list structures.
+
+    Iterative depth-first walk over an explicit stack of (container, path, child iterator)
+    frames instead of recursion: no Python frame per nested node, no recursion limit on
+    deep snapshots, and each child is matched and (if it is a container) descended into in
+    the same step. Results come out in the same order as with the former recursive walk.
+
+    Paths are kept as a trail of (key, in_dict) segments and only rendered to the
+    "a.b[3].c" string for matches, so non-matching nodes cost no string building.
+    """
     results = []
-    
-    if isinstance(obj, dict):
-        for key, value in obj.items():
-            current_path = f"{path}.{key}" if path else key
-            
+    if not isinstance(obj, (dict, list)):
+        return results
+
+    # Loop invariants: only the haystack side is converted per node
+    search_lower = search_value.lower()
+    search_str = str(search_value)
+    # Needles without letters (e.g. numeric IDs like "830081") need no case folding: for ASCII
+    # non-letters, `needle in value` is equivalent to `needle in value.lower()`, and the plain
+    # C-level substring search skips allocating a lowered copy of every string in the snapshot.
+    fold_case = not (search_value.isascii() and search_lower == search_value.upper())
+    # str() of an int/float/bool is "True"/"False" or something float() parses ("12", "1e-05",
+    # "inf", "nan"); for any other search text, numeric nodes are skipped without str(value)
+    try:
+        float(search_str)
+        numeric_search = True
+    except ValueError:
+        numeric_search = search_str in ("True", "False")
+
+    # trail[i] is the segment under which stack[i + 1] was entered
+    trail = []
+    stack = [(obj, iter(obj.items()) if isinstance(obj, dict) else enumerate(obj))]
+    while stack:
+        parent, children = stack[-1]
+        is_dict = isinstance(parent, dict)
+        for key, value in children:
+            # Exact type checks (pointer comparisons) instead of isinstance: parsed JSON only
+            # holds plain dict/list/str/int/float/bool; bool counts as numeric as before
+            value_type = type(value)
             # Check if the value matches
-            if isinstance(value, str) and search_value.lower() in value.lower():
+            if (value_type is str and (search_lower in value.lower() if fold_case else search_value in value)) or \
+                    (numeric_search and (value_type is int or value_type is float or value_type is bool)
+                     and search_str == str(value)):
                 results.append({
-                    "path": current_path,
-                    "key": key,
+                    "path": render_path(path, trail + [(key, is_dict)]),
+                    "key" if is_dict else "index": key,
                     "value": value,
-                    "parent": obj
-                })
-            elif isinstance(value, (int, float)) and str(search_value) == str(value):
-                results.append({
-                    "path": current_path,
-                    "key": key,
-                    "value": value,
-                    "parent": obj
-                })
-            
-            # Recurse into nested structures
-            if isinstance(value, (dict, list)):
-                results.extend(search_in_dict(value, search_value, current_path))
-                
-    elif isinstance(obj, list):
-        for idx, item in enumerate(obj):
-            current_path = f"{path}[{idx}]"
-            
-            # Check if item matches
-            if isinstance(item, str) and search_value.lower() in item.lower():
-                results.append({
-                    "path": current_path,
-                    "index": idx,
-                    "value": item,
-                    "parent": obj
+                    "parent": parent
                 })
-            elif isinstance(item, (int, float)) and str(search_value) == str(item):
-                results.append({
-                    "path": current_path,
-                    "index": idx,
-                    "value": item,
-                    "parent": obj
-                })
-            
-            # Recurse into nested structures
-            if isinstance(item, (dict, list)):
-                results.extend(search_in_dict(item, search_value, current_path))
-    
+
+            # Descend into nested structures; the parent frame resumes afterwards
+            if value_type is dict or value_type is list:
+                trail.append((key, is_dict))
+                stack.append((value, iter(value.items()) if value_type is dict else enumerate(value)))
+                break
+        else:
+            stack.pop()
+            if trail:
+                trail.pop()
+
     return results
 
 
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _levenshtein_codes(a, b):
+        """Levenshtein DP over two code point arrays (UTF-32), with two reused row buffers"""
+        n = b.shape[0]
+        previous_row = np.arange(n + 1, dtype=np.int32)
+        current_row = np.empty(n + 1, dtype=np.int32)
+        for i in range(a.shape[0]):
+            current_row[0] = i + 1
+            c1 = a[i]
+            for j in range(n):
+                cost = 0 if c1 == b[j] else 1
+                current_row[j + 1] = min(min(previous_row[j + 1] + 1, current_row[j] + 1), previous_row[j] + cost)
+            previous_row, current_row = current_row, previous_row
+        return previous_row[n]
+
+
 def levenshtein_distance(s1: str, s2: str) -> int:
     """Calculate Levenshtein distance between two strings"""
+    if RAPIDFUZZ_AVAILABLE:
+        return RapidfuzzLevenshtein.distance(s1, s2)
+    if NUMBA_AVAILABLE:
+        return int(_levenshtein_codes(np.frombuffer(s1.encode('utf-32-le', 'surrogatepass'), dtype=np.int32),
+                                      np.frombuffer(s2.encode('utf-32-le', 'surrogatepass'), dtype=np.int32)))
+
     if len(s1) < len(s2):
         return levenshtein_distance(s2, s1)
     
@@ -231,9 +474,15 @@ def levenshtein_distance(s1: str, s2: str) -> int:
 
 def calculate_similarity_score(search_value: str, candidate: str) -> float:
     """Calculate similarity score (0-1, where 1 is identical)"""
-    search_lower = search_value.lower()
-    candidate_lower = candidate.lower()
-    
+    return similarity_score_lowered(search_value.lower(), candidate.lower())
+
+
+@lru_cache(maxsize=65536)
+def similarity_score_lowered(search_lower: str, candidate_lower: str) -> float:
+    """
+    Similarity of two already lowercased strings. Cached: the same leaf values (units,
+    department names, ...) recur throughout a snapshot; search_by_id clears it afterwards.
+    """
     # Exact match
     if search_lower == candidate_lower:
         return 1.0
@@ -254,48 +503,91 @@ def calculate_similarity_score(search_value: str, candidate: str) -> float:
     return min(1.0, similarity + substring_bonus)
 
 
-def fuzzy_search_in_dict(obj: Any, search_value: str, path: str = "", min_similarity: float = 0.6) -> List[Tuple[Dict, float]]:
-    """Recursively search for similar values using fuzzy matching"""
+def could_reach_similarity(search_lower: str, candidate_lower: str, min_similarity: float) -> bool:
+    """
+    O(1) pre-check before the Levenshtein DP: the distance is at least the length gap, so
+    1 - gap/max_len (+ 0.2 only if one string contains the other) bounds the score from above.
+    """
+    max_len = max(len(search_lower), len(candidate_lower))
+    if max_len == 0:
+        return True
+    length_bound = 1.0 - (abs(len(search_lower) - len(candidate_lower)) / max_len)
+    if length_bound + 0.2 < min_similarity:
+        return False
+    if length_bound < min_similarity:
+        # Only the substring bonus could still lift the score over the threshold
+        return search_lower in candidate_lower or candidate_lower in search_lower
+    return True
+
+
+def fuzzy_search_in_dict(obj: Any, search_value: str, path: str = "", min_similarity: float = 0.6,
+                         top_n: int = None) -> List[Tuple[Dict, float]]:
+    """
+    Search for similar values using fuzzy matching.
+
+    Iterative depth-first walk over (container, child iterator) frames like
+    search_in_dict: dicts and lists share one loop, all matches go into a single
+    result list (no per-level sub-lists copied up via extend), and paths are rendered
+    from the (key, in_dict) trail only for matches.
+
+    With `top_n`, only the best `top_n` matches are kept in a min-heap during the walk
+    and returned sorted by similarity (highest first, ties in traversal order) - the
+    same as sorting all matches and slicing, without holding every match in memory.
+    """
     results = []
-    
-    if isinstance(obj, dict):
-        for key, value in obj.items():
-            current_path = f"{path}.{key}" if path else key
-            
+    if not isinstance(obj, (dict, list)):
+        return results
+
+    search_lower = search_value.lower()
+    # Heap entries: (similarity, -sequence, match); the smallest is the weakest kept match
+    top_heap = []
+    sequence = 0
+
+    # trail[i] is the segment under which stack[i + 1] was entered
+    trail = []
+    stack = [(obj, iter(obj.items()) if isinstance(obj, dict) else enumerate(obj))]
+    while stack:
+        parent, children = stack[-1]
+        is_dict = isinstance(parent, dict)
+        for key, value in children:
+            value_type = type(value)
             # Check if the value is similar
-            if isinstance(value, str) and len(value) > 0:
-                similarity = calculate_similarity_score(search_value, value)
-                if similarity >= min_similarity:
-                    results.append(({
-                        "path": current_path,
-                        "key": key,
+            if value_type is str and value:
+                candidate_lower = value.lower()
+                if could_reach_similarity(search_lower, candidate_lower, min_similarity):
+                    similarity = similarity_score_lowered(search_lower, candidate_lower)
+                else:
+                    similarity = 0.0  # below the threshold without running the DP
+                # Equal similarity never displaces an earlier kept match (stable sort order)
+                if similarity >= min_similarity and \
+                        (top_n is None or len(top_heap) < top_n or (top_heap and similarity > top_heap[0][0])):
+                    match = ({
+                        "path": render_path(path, trail + [(key, is_dict)]),
+                        "key" if is_dict else "index": key,
                         "value": value,
-                        "parent": obj
-                    }, similarity))
-            
-            # Recurse into nested structures
-            if isinstance(value, (dict, list)):
-                results.extend(fuzzy_search_in_dict(value, search_value, current_path, min_similarity))
-                
-    elif isinstance(obj, list):
-        for idx, item in enumerate(obj):
-            current_path = f"{path}[{idx}]"
-            
-            # Check if item is similar
-            if isinstance(item, str) and len(item) > 0:
-                similarity = calculate_similarity_score(search_value, item)
-                if similarity >= min_similarity:
-                    results.append(({
-                        "path": current_path,
-                        "index": idx,
-                        "value": item,
-                        "parent": obj
-                    }, similarity))
-            
-            # Recurse into nested structures
-            if isinstance(item, (dict, list)):
-                results.extend(fuzzy_search_in_dict(item, search_value, current_path, min_similarity))
-    
+                        "parent": parent
+                    }, similarity)
+                    if top_n is None:
+                        results.append(match)
+                    else:
+                        sequence += 1
+                        if len(top_heap) < top_n:
+                            heapq.heappush(top_heap, (similarity, -sequence, match))
+                        else:
+                            heapq.heapreplace(top_heap, (similarity, -sequence, match))
+
+            # Descend into nested structures; the parent frame resumes afterwards
+            if value_type is dict or value_type is list:
+                trail.append((key, is_dict))
+                stack.append((value, iter(value.items()) if value_type is dict else enumerate(value)))
+                break
+        else:
+            stack.pop()
+            if trail:
+                trail.pop()
+
+    if top_n is not None:
+        results = [match for _, _, match in sorted(top_heap, reverse=True)]
     return results
 
 
@@ -307,13 +599,11 @@ def search_by_id(data: Dict, search_id: str) -> List[Dict]:
     # If no exact matches found, try fuzzy search
     if not results:
         print(f"No exact matches found. Trying fuzzy search...")
-        fuzzy_results = fuzzy_search_in_dict(data, search_id, min_similarity=0.6)
+        # Top 5 by similarity (highest first), selected during the walk
+        top_matches = fuzzy_search_in_dict(data, search_id, min_similarity=0.6, top_n=5)
+        similarity_score_lowered.cache_clear()
         
-        if fuzzy_results:
-            # Sort by similarity (highest first) and take top 5
-            fuzzy_results.sort(key=lambda x: x[1], reverse=True)
-            top_matches = fuzzy_results[:5]
-            
+        if top_matches:
             print(f"\nFound {len(top_matches)} similar match(es):")
             for result, similarity in top_matches:
                 print(f"  - {result['value']} (similarity: {similarity:.2f})")
@@ -357,89 +647,272 @@ def display_results(results: List[Dict], search_value: str):
         parent = result.get('parent')
         if isinstance(parent, dict) and len(parent) <= 20:
             print(f"  Context (parent object):")
-            for k, v in list(parent.items())[:10]:
+            for k, v in islice(parent.items(), 10):
                 value_str = str(v)[:100] if not isinstance(v, (dict, list)) else f"<{type(v).__name__}>"
                 print(f"    {k}: {value_str}")
         
         print()
 
 
-def find_references(data: Dict, target_value: str, result_path: str) -> Dict:
-    """Find references to the target value in the data"""
-    references = {
-        "successor_demands": [],
-        "predecessor_demands": [],
-        "customer_orders": []
+def build_snapshot_indexes(data: Dict) -> Dict:
+    """
+    Build lookup structures over the snapshot once, so the per-result helpers
+    (find_references, get_article_context) no longer rescan the full arrays.
+
+    - article_by_id:     str(article["id"]) -> first article with that id
+    - demand_entries:    (index, demand) for every demand that is a dict, so the isinstance
+                         filter runs once instead of in every helper loop
+    - successor_entries: (index, demand, successor) for every demand with a non-empty successor
+    - demands_by_article: articleId -> [(index, demand), ...] in array order
+    - demands_by_id:     non-empty string demandId -> [(index, demand), ...] in array order
+    - cop_entries:       (index, position, str(position["id"])) for every customerOrderPosition
+                         that is a dict, so the id is stringified once and not once per result
+    - cop_texts:         index -> str(position), filled lazily by find_references so each
+                         position is stringified at most once across all results
+    - references_by_target / successors_by_text: per-target memos filled by find_references
+    - array_contexts:    (array, index, before, after) -> context, memo filled by get_array_context
+                         (results in the same array element share one context)
+    - article_similarity / all_equipment_keys: added lazily by get_array_context
+    """
+    article_by_id = {}
+    articles = data.get("articles")
+    if isinstance(articles, list):
+        for article in articles:
+            if isinstance(article, dict):
+                article_by_id.setdefault(str(article.get("id")), article)
+
+    demand_entries = []
+    successor_entries = []
+    demands_by_article = {}
+    demands_by_id = {}
+    demands = data.get("demands")
+    if isinstance(demands, list):
+        for idx, demand in enumerate(demands):
+            if not isinstance(demand, dict):
+                continue
+            demand_entries.append((idx, demand))
+            try:
+                demands_by_article.setdefault(demand.get("articleId"), []).append((idx, demand))
+            except TypeError:
+                pass  # unhashable articleId (list/dict) can never be looked up
+            demand_id = demand.get("demandId", "")
+            if demand_id and isinstance(demand_id, str):
+                demands_by_id.setdefault(demand_id, []).append((idx, demand))
+            successor = demand.get("successor", "")
+            successor = successor.strip() if isinstance(successor, str) else ""
+            if successor:
+                successor_entries.append((idx, demand, successor))
+
+    cop_entries = []
+    cops = data.get("customerOrderPositions")
+    if isinstance(cops, list):
+        for idx, cop in enumerate(cops):
+            if isinstance(cop, dict):
+                cop_entries.append((idx, cop, str(cop.get("id", ""))))
+
+    return {
+        "article_by_id": article_by_id,
+        "demand_entries": demand_entries,
+        "successor_entries": successor_entries,
+        "demands_by_article": demands_by_article,
+        "demands_by_id": demands_by_id,
+        "cop_entries": cop_entries,
+        "cop_texts": {},
+        "references_by_target": {},
+        "successors_by_text": {},
+        "array_contexts": {}
     }
-    
+
+
+def find_references(data: Dict, target_value: str, result_path: str, indexes: Dict = None) -> Dict:
+    """
+    Find references to the target value in the data.
+
+    Predecessors and customer orders depend only on the target value, which is the same for
+    every result of a search, and the successor matches only on the target's successor
+    string; both are computed once and then served from memos in `indexes`.
+    """
+    if indexes is None:
+        indexes = build_snapshot_indexes(data)
+
     # Extract index from path (e.g., "demands[165]" -> 165)
     if "[" in result_path and "]" in result_path:
         try:
-            index_str = result_path.split("[")[1].split("]")[0]
-            target_index = int(index_str)
+            target_index = int(ARRAY_PATH_RE.match(result_path).group(2))
         except:
             target_index = None
     else:
         target_index = None
-    
-    # Search in demands for successors/predecessors
-    if "demands" in data and isinstance(data["demands"], list):
-        for idx, demand in enumerate(data["demands"]):
-            if not isinstance(demand, dict):
-                continue
-            
-            # Check if this demand has the target as successor
-            successor = demand.get("successor", "").strip()
-            if successor and target_value in successor:
-                references["predecessor_demands"].append({
+
+    target_references = indexes["references_by_target"].get(target_value)
+    if target_references is None:
+        # Demands that have the target as successor (only demands with a successor are indexed)
+        predecessor_demands = []
+        for idx, demand, successor in indexes["successor_entries"]:
+            if target_value in successor:
+                predecessor_demands.append({
                     "index": idx,
                     "demandId": demand.get("demandId"),
                     "articleId": demand.get("articleId"),
                     "quantity": demand.get("quantity"),
                     "dueDate": demand.get("dueDate")
                 })
-            
-            # Check if target demand has this as successor
-            if target_index is not None and idx != target_index:
-                target_demand = data["demands"][target_index] if target_index < len(data["demands"]) else {}
-                target_successor = target_demand.get("successor", "").strip() if isinstance(target_demand, dict) else ""
-                if target_successor:
-                    demand_id = demand.get("demandId", "")
-                    if demand_id and demand_id in target_successor:
-                        references["successor_demands"].append({
-                            "index": idx,
-                            "demandId": demand_id,
-                            "articleId": demand.get("articleId"),
-                            "quantity": demand.get("quantity"),
-                            "dueDate": demand.get("dueDate")
-                        })
-    
-    # Search in customerOrderPositions
-    if "customerOrderPositions" in data and isinstance(data["customerOrderPositions"], list):
-        for idx, cop in enumerate(data["customerOrderPositions"]):
-            if not isinstance(cop, dict):
-                continue
-            
+
+        # Search in customerOrderPositions
+        customer_orders = []
+        cop_texts = indexes["cop_texts"]
+        for idx, cop, cop_id in indexes["cop_entries"]:
             # Check if this customer order references the target demand
-            cop_id = str(cop.get("id", ""))
-            if target_value in cop_id or target_value in str(cop):
-                references["customer_orders"].append({
-                    "index": idx,
-                    "esaromOrderNumber": cop.get("esaromOrderNumber"),
-                    "customerName": cop.get("customerName"),
-                    "articleId": cop.get("articleId"),
-                    "quantity": cop.get("quantity"),
-                    "dueDate": cop.get("dueDate")
+            if target_value not in cop_id:
+                cop_text = cop_texts.get(idx)
+                if cop_text is None:
+                    cop_text = cop_texts[idx] = str(cop)
+                if target_value not in cop_text:
+                    continue
+            customer_orders.append({
+                "index": idx,
+                "esaromOrderNumber": cop.get("esaromOrderNumber"),
+                "customerName": cop.get("customerName"),
+                "articleId": cop.get("articleId"),
+                "quantity": cop.get("quantity"),
+                "dueDate": cop.get("dueDate")
+            })
+
+        target_references = indexes["references_by_target"][target_value] = (predecessor_demands, customer_orders)
+
+    # Search in demands for successors of the target demand
+    # (the target's successor is loop-invariant: resolved once, loop skipped if it is empty)
+    target_successor = ""
+    demands = data.get("demands")
+    if target_index is not None and isinstance(demands, list) and target_index < len(demands):
+        target_demand = demands[target_index]
+        if isinstance(target_demand, dict):
+            target_successor = target_demand.get("successor", "")
+            target_successor = target_successor.strip() if isinstance(target_successor, str) else ""
+
+    successor_demands = []
+    if target_successor:
+        successor_matches = indexes["successors_by_text"].get(target_successor)
+        if successor_matches is None:
+            # Demands whose demandId occurs in the target's successor text. A short text has
+            # fewer distinct substrings than there are demand IDs: look each one up instead of
+            # testing every demand (sorted back into array order)
+            demands_by_id = indexes["demands_by_id"]
+            text_len = len(target_successor)
+            if text_len * (text_len + 1) // 2 <= len(demands_by_id):
+                substrings = {target_successor[start:end]
+                              for start in range(text_len) for end in range(start + 1, text_len + 1)}
+                matching_demands = sorted(
+                    (entry for substring in substrings for entry in demands_by_id.get(substring, ())),
+                    key=lambda entry: entry[0]
+                )
+            else:
+                matching_demands = [
+                    (idx, demand) for demand_id, entries in demands_by_id.items()
+                    if demand_id in target_successor for idx, demand in entries
+                ]
+                matching_demands.sort(key=lambda entry: entry[0])
+            successor_matches = [(idx, {
+                "index": idx,
+                "demandId": demand["demandId"],
+                "articleId": demand.get("articleId"),
+                "quantity": demand.get("quantity"),
+                "dueDate": demand.get("dueDate")
+            }) for idx, demand in matching_demands]
+            indexes["successors_by_text"][target_successor] = successor_matches
+        successor_demands = [entry for idx, entry in successor_matches if idx != target_index]
+
+    return {
+        "successor_demands": successor_demands,
+        "predecessor_demands": list(target_references[0]),
+        "customer_orders": list(target_references[1])
+    }
+
+
+def get_article_prefix(article_id: Any) -> Any:
+    """Article prefix, e.g. "SPE_ZU" from "SPE_ZU_kl"; None for non-string ids"""
+    if not isinstance(article_id, str):
+        return None
+    return '_'.join(article_id.split('_')[:2]) if '_' in article_id else article_id
+
+
+def build_article_similarity_index(articles: List) -> Dict:
+    """
+    Candidate lookup for the similar_items of get_array_context, built in one pass.
+
+    Every similar article shares the departmentId or the article prefix with the target
+    (same department+workplan implies same department), so the union of the two buckets
+    covers all matches. Items with an unhashable departmentId are always candidates.
+    `prefixes[i]` is the article prefix of articles[i], computed once for all calls.
+    """
+    by_department = {}
+    by_prefix = {}
+    unindexed = []
+    prefixes = [None] * len(articles)
+    for i, item in enumerate(articles):
+        if not isinstance(item, dict):
+            continue
+        try:
+            by_department.setdefault(item.get('departmentId'), []).append(i)
+        except TypeError:
+            unindexed.append(i)
+        prefix = prefixes[i] = get_article_prefix(item.get('articleId', ''))
+        if prefix:
+            by_prefix.setdefault(prefix, []).append(i)
+    return {"by_department": by_department, "by_prefix": by_prefix, "unindexed": unindexed,
+            "prefixes": prefixes}
+
+
+def build_equipment_key_list(data: Dict) -> List[Dict]:
+    """equipmentKey / name / functions of every equipment that has a key, in array order"""
+    all_equipment_keys = []
+    for item in data.get('equipment', []):
+        if isinstance(item, dict):
+            eq_key = item.get('equipmentKey')
+            if eq_key:
+                all_equipment_keys.append({
+                    'equipmentKey': eq_key,
+                    'name': item.get('name'),
+                    'functions': item.get('functions')
                 })
-    
-    return references
+    return all_equipment_keys
 
 
-def get_array_context(data: Dict, result_path: str, items_before: int = 3, items_after: int = 3) -> Dict:
+def summarize_values(values: List) -> Dict:
+    """
+    min / max / median / count of a non-empty value list (median = sorted(values)[len // 2]).
+
+    Long purely numeric lists are reduced with numpy when it is installed; the returned
+    min/max/median are still the original list elements (first occurrence, stable order),
+    so the result is identical to the Python path.
+    """
+    if NUMPY_AVAILABLE and len(values) >= NUMPY_STATS_MIN_VALUES:
+        array = np.array(values)
+        # Strings, mixed types or oversized ints end up as other dtypes -> Python path
+        if array.dtype.kind in "iu" or (array.dtype.kind == "f" and not np.isnan(array).any()):
+            return {
+                'min': values[int(array.argmin())],
+                'max': values[int(array.argmax())],
+                'median': values[int(np.argsort(array, kind='stable')[len(values) // 2])],
+                'count': len(values)
+            }
+
+    return {
+        'min': min(values),
+        'max': max(values),
+        'median': statistics.median_high(values),
+        'count': len(values)
+    }
+
+
+def get_array_context(data: Dict, result_path: str, items_before: int = 3, items_after: int = 3, indexes: Dict = None) -> Dict:
     """
     Get surrounding array items for context analysis.
     Returns neighboring items from the array for pattern and statistical analysis.
     For articles array: Also provides similar_items based on domain intelligence (departmentId, workPlanId, article prefix).
+    Candidates come from build_article_similarity_index (cached in `indexes` when given)
+    instead of a scan over all articles. With `indexes`, the context only depends on the
+    array element, so it is built once per element and copied for further results.
     """
     array_context = {}
     
@@ -448,13 +921,20 @@ def get_array_context(data: Dict, result_path: str, items_before: int = 3, items
     if "[" not in result_path or "]" not in result_path:
         return {}  # Not an array element
     
+    path_match = ARRAY_PATH_RE.match(result_path)
+    array_name = path_match.group(1)  # Last part before the first [
     try:
-        parts = result_path.split("[")
-        array_name = parts[0].split(".")[-1]  # Get last part before [
-        index_str = parts[1].split("]")[0]
-        target_index = int(index_str)
-    except (ValueError, IndexError):
+        target_index = int(path_match.group(2))
+    except ValueError:
         return {}
+    if target_index < 0:
+        return {}  # Result paths come from enumerate(), a negative index is no array element
+
+    if indexes is not None:
+        memo_key = (array_name, target_index, items_before, items_after)
+        cached_context = indexes["array_contexts"].get(memo_key)
+        if cached_context is not None:
+            return dict(cached_context)
     
     # Find the array in data
     array_data = None
@@ -470,20 +950,13 @@ def get_array_context(data: Dict, result_path: str, items_before: int = 3, items
     if not array_data:
         return {}
     
-    # Get neighboring items
+    # Get neighboring items; slices are clipped to the array and hold references to the
+    # snapshot objects (no copies), like the former index loops
     start_idx = max(0, target_index - items_before)
     end_idx = min(len(array_data), target_index + items_after + 1)
     
-    items_before_list = []
-    items_after_list = []
-    
-    for i in range(start_idx, target_index):
-        if i < len(array_data):
-            items_before_list.append(array_data[i])
-    
-    for i in range(target_index + 1, end_idx):
-        if i < len(array_data):
-            items_after_list.append(array_data[i])
+    items_before_list = array_data[start_idx:target_index]
+    items_after_list = array_data[target_index + 1:end_idx]
     
     array_context = {
         "array_name": array_name,
@@ -503,15 +976,32 @@ def get_array_context(data: Dict, result_path: str, items_before: int = 3, items
             target_articleid = target_item.get('articleId', '')
             
             # Extract article prefix (e.g., "SPE_ZU" from "SPE_ZU_kl")
-            article_prefix = '_'.join(target_articleid.split('_')[:2]) if '_' in target_articleid else target_articleid
+            article_prefix = get_article_prefix(target_articleid)
+
+            if indexes is not None:
+                if "article_similarity" not in indexes:
+                    indexes["article_similarity"] = build_article_similarity_index(array_data)
+                similarity_index = indexes["article_similarity"]
+            else:
+                similarity_index = build_article_similarity_index(array_data)
+
+            # Candidates: same department or same prefix; each is checked against the criteria below
+            try:
+                candidates = set(similarity_index["by_department"].get(target_dept, ()))
+                candidates.update(similarity_index["unindexed"])
+            except TypeError:
+                candidates = set(range(len(array_data)))  # unhashable target departmentId
+            if article_prefix:
+                candidates.update(similarity_index["by_prefix"].get(article_prefix, ()))
             
-            # Collect all similar articles (excluding target itself)
-            for i, item in enumerate(array_data):
+            # Collect all similar articles (excluding target itself), in array order
+            prefixes = similarity_index["prefixes"]
+            for i in sorted(candidates):
+                item = array_data[i]
                 if i == target_index or not isinstance(item, dict):
                     continue
                 
-                item_articleid = item.get('articleId', '')
-                item_prefix = '_'.join(item_articleid.split('_')[:2]) if '_' in item_articleid else item_articleid
+                item_prefix = prefixes[i]
                 
                 # Match criteria (in order of preference):
                 # 1. Same departmentId AND workPlanId (best match)
@@ -540,27 +1030,16 @@ def get_array_context(data: Dict, result_path: str, items_before: int = 3, items
             # Calculate statistics for numerical fields if we have similar items
             stats = {}
             if similar_items:
-                # relDensityMin statistics
-                density_min_values = [item['relDensityMin'] for item in similar_items if item.get('relDensityMin') is not None]
-                if density_min_values:
-                    density_min_values_sorted = sorted(density_min_values)
-                    stats['relDensityMin'] = {
-                        'min': min(density_min_values),
-                        'max': max(density_min_values),
-                        'median': density_min_values_sorted[len(density_min_values_sorted) // 2],
-                        'count': len(density_min_values)
-                    }
+                # relDensityMin / relDensityMax values collected in one pass over similar_items
+                density_values = {'relDensityMin': [], 'relDensityMax': []}
+                for item in similar_items:
+                    for field, values in density_values.items():
+                        if item[field] is not None:
+                            values.append(item[field])
                 
-                # relDensityMax statistics
-                density_max_values = [item['relDensityMax'] for item in similar_items if item.get('relDensityMax') is not None]
-                if density_max_values:
-                    density_max_values_sorted = sorted(density_max_values)
-                    stats['relDensityMax'] = {
-                        'min': min(density_max_values),
-                        'max': max(density_max_values),
-                        'median': density_max_values_sorted[len(density_max_values_sorted) // 2],
-                        'count': len(density_max_values)
-                    }
+                for field, values in density_values.items():
+                    if values:
+                        stats[field] = summarize_values(values)
             
             array_context['similar_items'] = similar_items
             array_context['similar_items_count'] = len(similar_items)
@@ -579,47 +1058,48 @@ def get_array_context(data: Dict, result_path: str, items_before: int = 3, items
             needs_equipment_keys = True
     
     if needs_equipment_keys:
-        # Get all equipment from the equipment array (not from current array)
-        all_equipment_keys = []
-        equipment_array = data.get('equipment', [])
-        for item in equipment_array:
-            if isinstance(item, dict):
-                eq_key = item.get('equipmentKey')
-                if eq_key:
-                    all_equipment_keys.append({
-                        'equipmentKey': eq_key,
-                        'name': item.get('name'),
-                        'functions': item.get('functions')
-                    })
+        # Get all equipment from the equipment array (not from current array); the list only
+        # depends on the snapshot, so it is built once and shared via the indexes
+        if indexes is not None and "all_equipment_keys" in indexes:
+            all_equipment_keys = indexes["all_equipment_keys"]
+        else:
+            all_equipment_keys = build_equipment_key_list(data)
+            if indexes is not None:
+                indexes["all_equipment_keys"] = all_equipment_keys
         
         array_context['all_equipment_keys'] = all_equipment_keys
         array_context['total_equipment_count'] = len(all_equipment_keys)
     
+    if indexes is not None:
+        indexes["array_contexts"][memo_key] = array_context
+        array_context = dict(array_context)
     return array_context
 
 
-def get_article_context(data: Dict, article_id: Any) -> Dict:
+def get_article_context(data: Dict, article_id: Any, indexes: Dict = None) -> Dict:
     """Get context information about an article"""
-    if "articles" not in data or not isinstance(data["articles"], list):
+    if indexes is None:
+        indexes = build_snapshot_indexes(data)
+
+    article = indexes["article_by_id"].get(str(article_id))
+    if article is None:
         return {}
     
-    for article in data["articles"]:
-        if not isinstance(article, dict):
-            continue
-        if str(article.get("id")) == str(article_id):
-            return {
-                "id": article.get("id"),
-                "name": article.get("name"),
-                "departmentName": article.get("departmentName"),
-                "minBatchSize": article.get("minBatchSize"),
-                "maxBatchSize": article.get("maxBatchSize")
-            }
-    
-    return {}
+    return {
+        "id": article.get("id"),
+        "name": article.get("name"),
+        "departmentName": article.get("departmentName"),
+        "minBatchSize": article.get("minBatchSize"),
+        "maxBatchSize": article.get("maxBatchSize")
+    }
 
 
-def build_enriched_context(data: Dict, search_mode: str, search_value: str, results: List[Dict]) -> Dict:
+def build_enriched_context(data: Dict, search_mode: str, search_value: str, results: List[Dict], indexes: Dict = None) -> Dict:
     """Build enriched context with examples, patterns, and related entities for LLM"""
+    if indexes is None:
+        indexes = build_snapshot_indexes(data)
+    demand_entries = indexes["demand_entries"]
+
     enriched = {
         "field_examples": {},
         "format_patterns": {},
@@ -628,23 +1108,37 @@ def build_enriched_context(data: Dict, search_mode: str, search_value: str, resu
     
     # Collect field examples from demands array (first 10 non-empty values)
     if "demands" in data and isinstance(data["demands"], list):
-        field_examples = {}
-        
         # Key fields to collect examples for
         key_fields = ["demandId", "articleId", "packaging", "successor", "dispatcherGroup"]
         
-        for field in key_fields:
-            examples = []
-            for demand in data["demands"]:
-                if isinstance(demand, dict) and field in demand:
-                    value = demand.get(field)
-                    if value and value != "" and value not in examples:
-                        examples.append(value)
-                        if len(examples) >= 10:
-                            break
-            if examples:
-                field_examples[field] = examples
+        # One pass over the demands for all key fields; a set per field replaces the
+        # O(examples) list membership test (list values are unhashable and fall back to it).
+        # Filled fields drop out, and the scan stops once all of them have 10 examples.
+        examples_by_field = {field: [] for field in key_fields}
+        seen_by_field = {field: set() for field in key_fields}
+        open_fields = list(key_fields)
+        for _, demand in demand_entries:
+            for field in open_fields:
+                if field not in demand:
+                    continue
+                value = demand.get(field)
+                if not value:
+                    continue
+                examples = examples_by_field[field]
+                try:
+                    if value in seen_by_field[field]:
+                        continue
+                    seen_by_field[field].add(value)
+                except TypeError:
+                    if value in examples:
+                        continue
+                examples.append(value)
+                if len(examples) >= 10:
+                    open_fields = [f for f in open_fields if f != field]
+            if not open_fields:
+                break
         
+        field_examples = {field: examples for field, examples in examples_by_field.items() if examples}
         enriched["field_examples"] = field_examples
         
         # CRITICAL: For packaging field errors, also collect valid packaging IDs from packagingEquipmentCompatibility
@@ -677,29 +1171,47 @@ def build_enriched_context(data: Dict, search_mode: str, search_value: str, resu
         # Key fields to collect examples for equipment
         equipment_fields = ["qualification", "equipmentKey", "functions"]
         
-        for field in equipment_fields:
-            examples = []
-            for equipment in data["equipment"]:
-                if isinstance(equipment, dict) and field in equipment:
-                    value = equipment.get(field)
-                    # Handle both string and list values
-                    if value and value != "":
-                        if isinstance(value, list):
-                            # For list fields like functions, collect unique list items
-                            for item in value:
-                                if item and item not in examples:
-                                    examples.append(item)
-                                    if len(examples) >= 20:
-                                        break
-                        elif value not in examples:
-                            examples.append(value)
-                            if len(examples) >= 20:
-                                break
-                if len(examples) >= 20:
-                    break
+        # One pass over the equipment for all three fields (same set / early-exit scheme as
+        # for the demands above); list values like functions contribute their unique items
+        examples_by_field = {field: [] for field in equipment_fields}
+        seen_by_field = {field: set() for field in equipment_fields}
+        open_fields = list(equipment_fields)
+        for equipment in data["equipment"]:
+            if not isinstance(equipment, dict):
+                continue
+            for field in open_fields:
+                if field not in equipment:
+                    continue
+                value = equipment.get(field)
+                if not value:
+                    continue
+                examples = examples_by_field[field]
+                seen = seen_by_field[field]
+                for item in (value if isinstance(value, list) else (value,)):
+                    if not item:
+                        continue
+                    try:
+                        if item in seen:
+                            continue
+                        seen.add(item)
+                    except TypeError:
+                        if item in examples:
+                            continue
+                    examples.append(item)
+                    if len(examples) >= 20:
+                        open_fields = [f for f in open_fields if f != field]
+                        break
+            if not open_fields:
+                break
+        
+        for field, examples in examples_by_field.items():
             if examples:
                 enriched["field_examples"][field] = examples
         
+        # Valid demand IDs for related_entities (first 20); collected in the pattern pass
+        # below when it runs, otherwise in their own (early-exiting) loop
+        all_demand_ids = None
+
         # Pattern analysis for the error field
         if search_mode == "empty_field":
             field_name = search_value
@@ -713,13 +1225,20 @@ def build_enriched_context(data: Dict, search_mode: str, search_value: str, resu
             }
             
             lengths = []
-            for demand in data["demands"]:
-                if isinstance(demand, dict) and field_name in demand:
+            all_demand_ids = []
+            for _, demand in demand_entries:
+                if len(all_demand_ids) < 20 and "demandId" in demand:
+                    demand_id = demand.get("demandId")
+                    # Converted once; str() of a str value returns it unchanged
+                    demand_id_text = str(demand_id) if demand_id else ""
+                    if demand_id_text.strip():
+                        all_demand_ids.append(demand_id_text)
+                if field_name in demand:
                     pattern_data["total_count"] += 1
                     value = demand.get(field_name)
-                    if value and str(value).strip():
+                    str_value = str(value) if value else ""
+                    if str_value.strip():
                         pattern_data["non_empty_count"] += 1
-                        str_value = str(value)
                         lengths.append(len(str_value))
                         if len(pattern_data["sample_values"]) < 5:
                             pattern_data["sample_values"].append(str_value)
@@ -752,32 +1271,37 @@ def build_enriched_context(data: Dict, search_mode: str, search_value: str, resu
                     article_ids.add(parent.get("articleId"))
             
             if article_ids:
+                # First 5 demands (in array order) over the per-article buckets
+                candidates = []
+                for article_id in article_ids:
+                    candidates.extend(indexes["demands_by_article"].get(article_id, [])[:5])
+                candidates.sort(key=lambda entry: entry[0])
                 demands_same_article = []
-                for demand in data["demands"]:
-                    if isinstance(demand, dict):
-                        if demand.get("articleId") in article_ids:
-                            demands_same_article.append({
-                                "demandId": demand.get("demandId"),
-                                "articleId": demand.get("articleId"),
-                                "quantity": demand.get("quantity"),
-                                "dueDate": demand.get("dueDate")
-                            })
-                            if len(demands_same_article) >= 5:
-                                break
+                for _, demand in candidates[:5]:
+                    demands_same_article.append({
+                        "demandId": demand.get("demandId"),
+                        "articleId": demand.get("articleId"),
+                        "quantity": demand.get("quantity"),
+                        "dueDate": demand.get("dueDate")
+                    })
                 
                 if demands_same_article:
                     related["demands_same_article"] = demands_same_article
         
-        # Collect all valid demand IDs for reference checking
-        all_demand_ids = []
-        for demand in data["demands"]:
-            if isinstance(demand, dict) and "demandId" in demand:
-                demand_id = demand.get("demandId")
-                if demand_id and str(demand_id).strip():
-                    all_demand_ids.append(str(demand_id))
+        # Collect valid demand IDs for reference checking (first 20)
+        if all_demand_ids is None:
+            all_demand_ids = []
+            for _, demand in demand_entries:
+                if "demandId" in demand:
+                    demand_id = demand.get("demandId")
+                    demand_id_text = str(demand_id) if demand_id else ""
+                    if demand_id_text.strip():
+                        all_demand_ids.append(demand_id_text)
+                        if len(all_demand_ids) >= 20:
+                            break
         
         if all_demand_ids:
-            related["all_valid_demand_ids"] = all_demand_ids[:20]  # First 20 for reference
+            related["all_valid_demand_ids"] = all_demand_ids  # First 20 for reference
         
         enriched["related_entities"] = related
     
@@ -785,13 +1309,24 @@ def build_enriched_context(data: Dict, search_mode: str, search_value: str, resu
 
 
 def search_empty_field(obj: Any, field_name: str, path: str = "") -> List[Dict]:
-    """Search for objects where a specific field is empty, null, or whitespace-only"""
+    """
+    Search for objects where a specific field is empty, null, or whitespace-only.
+
+    Iterative depth-first walk (explicit stack, see search_in_dict); every dict is checked
+    when it is entered, so the result order matches the former recursive version. Like the
+    other walks it keeps a (key, in_dict) trail and only renders paths for matches.
+    """
     results = []
-    
-    if isinstance(obj, dict):
+    if not isinstance(obj, (dict, list)):
+        return results
+
+    # trail[i] is the segment under which stack[i + 1] was entered
+    trail = []
+
+    def check(node: Dict):
         # Check if this dict has the field and it's empty
-        if field_name in obj:
-            value = obj[field_name]
+        if field_name in node:
+            value = node[field_name]
             is_empty = (
                 value is None or 
                 value == "" or 
@@ -799,24 +1334,33 @@ def search_empty_field(obj: Any, field_name: str, path: str = "") -> List[Dict]:
             )
             if is_empty:
                 results.append({
-                    "path": f"{path}.{field_name}" if path else field_name,
+                    "path": render_path(path, trail + [(field_name, True)]),
                     "key": field_name,
                     "value": value,
-                    "parent": obj
+                    "parent": node
                 })
-        
-        # Recurse into nested structures
-        for key, val in obj.items():
-            current_path = f"{path}.{key}" if path else key
-            if isinstance(val, (dict, list)):
-                results.extend(search_empty_field(val, field_name, current_path))
-                
-    elif isinstance(obj, list):
-        for idx, item in enumerate(obj):
-            current_path = f"{path}[{idx}]"
-            if isinstance(item, (dict, list)):
-                results.extend(search_empty_field(item, field_name, current_path))
-    
+
+    if isinstance(obj, dict):
+        check(obj)
+    stack = [(obj, iter(obj.items()) if isinstance(obj, dict) else enumerate(obj))]
+    while stack:
+        parent, children = stack[-1]
+        is_dict = isinstance(parent, dict)
+        for key, value in children:
+            value_type = type(value)
+            if value_type is dict or value_type is list:
+                trail.append((key, is_dict))
+                if value_type is dict:
+                    check(value)
+                    stack.append((value, iter(value.items())))
+                else:
+                    stack.append((value, enumerate(value)))
+                break
+        else:
+            stack.pop()
+            if trail:
+                trail.pop()
+
     return results
 
 
@@ -858,7 +1402,8 @@ def main():
         required_key = sys.argv[2] if len(sys.argv) > 2 else None
         search_mode = "equipment_workitem"
         search_value = required_key
-        snapshot_id, data = load_snapshot_data(snapshot_id_arg)
+        # Only the equipment array is inspected in this mode
+        snapshot_id, data = load_snapshot_data(snapshot_id_arg, sections=["equipment"])
         if data is None:
             return
         print(f"Snapshot data loaded successfully")
@@ -875,9 +1420,11 @@ def main():
             "results_count": len(results),
             "results": results,
         }
-        storage.save_json(f"{snapshot_id}/last_search_results.json", output)
+        # Serialized once, written to the snapshot folder and the iteration folder
+        output_bytes = dump_json_bytes(output)
+        storage.save_bytes(f"{snapshot_id}/last_search_results.json", output_bytes)
         latest_iter = _get_latest_num(snapshot_id) or 1
-        storage.save_json(f"{snapshot_id}/iteration-{latest_iter}/last_search_results.json", output)
+        storage.save_bytes(f"{snapshot_id}/iteration-{latest_iter}/last_search_results.json", output_bytes)
         print(f"\nError Type: {error_type}")
         print("Identify tool completed successfully")
         return
@@ -901,8 +1448,8 @@ def main():
         print(f"Snapshot data loaded successfully")
         print(f"\nSearching for empty '{field_name}' fields...")
         
-        # First: Check for empty arrays at root level
-        empty_arrays = find_empty_arrays(data, field_name)
+        # First: Check for empty arrays at root level (only the first one is used)
+        empty_arrays = find_empty_arrays(data, field_name, first_only=True)
         
         if empty_arrays:
             print(f"\n[OK] Found empty array: {empty_arrays[0]['path']}")
@@ -997,21 +1544,35 @@ def main():
         error_type = "NO_RESULTS_FOUND"
     
     # Prepare enhanced results for JSON
-    json_results = []
+    # Lookup structures are built once here instead of rescanning the arrays per result
+    indexes = build_snapshot_indexes(data)
+
+    # Build original_structure section (array of original objects as they appear in the file)
+    # An object matching in several fields is listed once (deduplicated by identity)
+    original_structure = []
+    seen_parents = set()
     for r in results:
+        parent = r.get("parent", {})
+        if isinstance(parent, dict) and parent and id(parent) not in seen_parents:
+            seen_parents.add(id(parent))
+            original_structure.append(parent)
+
+    # One entry per result, filled by position
+    json_results = [None] * len(results)
+    for result_idx, r in enumerate(results):
         parent = r.get("parent", {})
         path = r.get("path", "")
         
         # Get references
-        references = find_references(data, search_value, path)
+        references = find_references(data, search_value, path, indexes)
         
         # Get article context if parent has articleId
         article_context = {}
         if isinstance(parent, dict) and "articleId" in parent:
-            article_context = get_article_context(data, parent.get("articleId"))
+            article_context = get_article_context(data, parent.get("articleId"), indexes)
         
         # Get array context (3 items before/after for pattern detection)
-        array_context = get_array_context(data, path, items_before=3, items_after=3)
+        array_context = get_array_context(data, path, items_before=3, items_after=3, indexes=indexes)
         
         # Get the actual parent object (not the array) for nested paths like equipment[0].predecessors[0]
         actual_parent = parent if isinstance(parent, dict) else {}
@@ -1021,10 +1582,8 @@ def main():
         if not isinstance(parent, dict) and '.' in path:
             # Extract the object containing the array
             # Example: equipment[0].predecessors[0] → extract equipment[0]
-            import re
-            obj_match = re.match(r'^(.+\[\d+\])\.[^.]+\[\d+\]$', path)
-            if obj_match:
-                obj_path = obj_match.group(1)  # equipment[0]
+            obj_path = nested_array_element_parent(path)  # equipment[0]
+            if obj_path:
                 # Navigate to that object
                 try:
                     # Split by array notation
@@ -1048,27 +1607,22 @@ def main():
         # Add all optional metadata from r (fuzzy match, empty array info, etc.)
         result_entry.update({k: v for k, v in r.items() if k not in result_entry and k not in ["parent", "key", "index"]})
         
-        json_results.append(result_entry)
-        
-        # Build context section
-        context = {
-            "total_demands_count": len(data.get("demands", [])) if "demands" in data else 0,
-            "total_customer_orders": len(data.get("customerOrderPositions", [])) if "customerOrderPositions" in data else 0,
-            "validation_rules": {
-                "demandId_must_be_unique": True,
-                "successor_must_reference_valid_demand": True
-            }
+        json_results[result_idx] = result_entry
+    
+    # Build context section (same for the result and the empty-result payload)
+    context = {
+        "total_demands_count": len(data.get("demands") or []),
+        "total_customer_orders": len(data.get("customerOrderPositions") or []),
+        "validation_rules": {
+            "demandId_must_be_unique": True,
+            "successor_must_reference_valid_demand": True
         }
-        
-        # Build original_structure section (array of original objects as they appear in the file)
-        original_structure = []
-        for r in results:
-            parent = r.get("parent", {})
-            if isinstance(parent, dict) and parent:
-                original_structure.append(parent)
-        
+    }
+
+    # Exactly one payload is written per run, so a file from an earlier run never survives
+    if results:
         # Build enriched context for LLM
-        enriched_context = build_enriched_context(data, search_mode, search_value, results)
+        enriched_context = build_enriched_context(data, search_mode, search_value, results, indexes)
 
         # Build result payload
         result_data = {
@@ -1082,34 +1636,11 @@ def main():
             "context": context,
             "enriched_context": enriched_context
         }
-
-        storage.save_json(f"{snapshot_id}/last_search_results.json", result_data)
-        print(f"Enhanced results saved to: {snapshot_id}/last_search_results.json")
-
-        # Also save to latest iteration folder if it exists
-        latest_num = _get_latest_num(snapshot_id)
-        if latest_num is not None:
-            storage.save_json(f"{snapshot_id}/iteration-{latest_num}/last_search_results.json", result_data)
-            print(f"Enhanced results also saved to: {snapshot_id}/iteration-{latest_num}/last_search_results.json")
-        
-        print(f"Error Type: {error_type}")
-        print(f"Total demands in snapshot: {context['total_demands_count']}")
-    
-    # Falls KEINE Ergebnisse gefunden wurden UND noch keine Datei erstellt wurde
-    if not results and not storage.exists(f"{snapshot_id}/last_search_results.json"):
+    else:
         # KEINE ERGEBNISSE → Erstelle trotzdem eine leere Datei für generate_correction_llm!
         print(f"No results found - creating empty last_search_results.json for pipeline compatibility")
 
-        context = {
-            "total_demands_count": len(data.get("demands", [])) if "demands" in data else 0,
-            "total_customer_orders": len(data.get("customerOrderPositions", [])) if "customerOrderPositions" in data else 0,
-            "validation_rules": {
-                "demandId_must_be_unique": True,
-                "successor_must_reference_valid_demand": True
-            }
-        }
-
-        storage.save_json(f"{snapshot_id}/last_search_results.json", {
+        result_data = {
             "snapshot_id": snapshot_id,
             "search_mode": search_mode,
             "search_value": search_value,
@@ -1122,10 +1653,26 @@ def main():
                 "error_summary": f"No instances of '{search_value}' found in snapshot",
                 "recommendations": ["Verify search term spelling", "Check if field name is correct", "Data may already be correct"]
             }
-        })
+        }
 
+    # Serialized once, reused for the iteration copy below
+    result_bytes = dump_json_bytes(result_data)
+    storage.save_bytes(f"{snapshot_id}/last_search_results.json", result_bytes)
+    if results:
+        print(f"Enhanced results saved to: {snapshot_id}/last_search_results.json")
+    else:
         print(f"Empty results file saved to: {snapshot_id}/last_search_results.json")
 
+    # Also save to latest iteration folder if it exists
+    latest_num = _get_latest_num(snapshot_id)
+    if latest_num is not None:
+        storage.save_bytes(f"{snapshot_id}/iteration-{latest_num}/last_search_results.json", result_bytes)
+        print(f"Enhanced results also saved to: {snapshot_id}/iteration-{latest_num}/last_search_results.json")
+
+    if results:
+        print(f"Error Type: {error_type}")
+        print(f"Total demands in snapshot: {context['total_demands_count']}")
+
 
 if __name__ == "__main__":
     main()
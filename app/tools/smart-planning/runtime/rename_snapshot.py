@@ -3,10 +3,12 @@ Skript zum Umbenennen eines Snapshots über die Smart Planning API.
 """
 import sys
 import requests
+from requests.adapters import HTTPAdapter
 import json
 import warnings
 import os
 import argparse
+import re
 from pathlib import Path
 from typing import Optional
 
@@ -40,6 +42,31 @@ SP_REALM = os.getenv("SMART_PLANNING_REALM", "Esarom")
 # SSL-Warnungen deaktivieren (für Test-Umgebung)
 warnings.filterwarnings('ignore', message='Unverified HTTPS request')
 
+# "name": "alter Name" in metadata.txt — nur noch Fallback, siehe _replace_metadata_name
+_METADATA_NAME_RE = re.compile(r'"name":\s*"[^"]*"')
+_ASCII_WHITESPACE = " \t\n\r\f\v"
+
+
+def _replace_metadata_name(content: str, new_name: str) -> str:
+    """
+    Ersetzt den ersten "name": "..."-Eintrag in metadata.txt durch new_name.
+    Schneller Pfad per str.find und Slicing; passt der erste "name"-Treffer nicht
+    ins Muster, sucht der vorkompilierte Regex wie bisher den ersten passenden Eintrag.
+    """
+    replacement = f'"name": "{new_name}"'
+    start = content.find('"name"')
+    if start != -1 and content.startswith(":", start + 6):
+        pos = start + 7
+        while pos < len(content) and content[pos] in _ASCII_WHITESPACE:
+            pos += 1
+        if content.startswith('"', pos):
+            end = content.find('"', pos + 1)
+            if end != -1:
+                return content[:start] + replacement + content[end + 1:]
+    # Lambda statt Ersetzungs-String: Backslashes im Namen werden nicht als Escapes gelesen
+    return _METADATA_NAME_RE.sub(lambda _: replacement, content, count=1)
+
+
 class SmartPlanningAPI:
     """Client für die Smart Planning API."""
     
@@ -49,6 +76,12 @@ class SmartPlanningAPI:
         self.token_uri = f"{self.base_uri}/keycloak/realms/{SP_REALM}/protocol/openid-connect/token"
         self.api_base_uri = f"{self.base_uri}/esarom-be/api/v1"
         self.token: Optional[str] = None
+        # Eine Session für Token-, GET- und PUT-Aufruf: die TCP/TLS-Verbindung wird
+        # wiederverwendet statt pro Request neu aufgebaut
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
         
     def authenticate(self, client_id: str = None, 
                     client_secret: Optional[str] = None) -> str:
@@ -66,7 +99,7 @@ class SmartPlanningAPI:
             "grant_type": "client_credentials"
         }
         
-        response = requests.post(
+        response = self.session.post(
             self.token_uri,
             headers={"Content-Type": "application/x-www-form-urlencoded"},
             data=data,
@@ -76,9 +109,34 @@ class SmartPlanningAPI:
         response.raise_for_status()
         
         self.token = response.json()["access_token"]
+        self.session.headers["Authorization"] = f"Bearer {self.token}"
         print("   ✓ Token erfolgreich abgerufen")
         return self.token
     
+    def _sync_metadata_name(self, snapshot_id: str, new_name: str) -> None:
+        """Überträgt den Namen in metadata.txt; geschrieben wird nur bei einer Änderung."""
+        storage = get_storage()
+        metadata_path = f"{snapshot_id}/metadata.txt"
+        
+        if storage.exists(metadata_path):
+            print(f"\n4. Aktualisiere metadata.txt im Storage...")
+            try:
+                # Lese metadata.txt
+                content = storage.load_text(metadata_path)
+                
+                # Finde JSON-Block und aktualisiere Name
+                updated_content = _replace_metadata_name(content, new_name)
+                
+                if updated_content == content:
+                    print(f"   ✓ metadata.txt bereits aktuell")
+                    return
+                
+                # Schreibe zurück
+                storage.save_text(metadata_path, updated_content)
+                print(f"   ✓ metadata.txt aktualisiert")
+            except Exception as e:
+                print(f"   ⚠ Warnung: Konnte metadata.txt nicht aktualisieren: {e}")
+    
     def rename_snapshot(self, snapshot_id: str, new_name: str) -> dict:
         """
         Ändert den Namen eines existierenden Snapshots.
@@ -98,12 +156,9 @@ class SmartPlanningAPI:
         
         # Zuerst aktuellen Snapshot abrufen (um dataJson zu bekommen)
         get_url = f"{self.api_base_uri}/snapshots/{snapshot_id}"
-        response = requests.get(
+        response = self.session.get(
             get_url,
-            headers={
-                "Authorization": f"Bearer {self.token}",
-                "Content-Type": "application/json"
-            },
+            headers={"Content-Type": "application/json"},
             verify=False,
             timeout=15
         )
@@ -118,6 +173,12 @@ class SmartPlanningAPI:
         
         print(f"   ✓ Snapshot abgerufen (aktueller Name: '{current_snapshot.get('name')}')")
         
+        # Name stimmt bereits: kein PUT mit dem kompletten dataJson nötig
+        if current_snapshot.get("name") == new_name:
+            print(f"   ✓ Name bereits aktuell")
+            self._sync_metadata_name(snapshot_id, new_name)
+            return {k: v for k, v in current_snapshot.items() if k != "dataJson"}
+        
         print(f"\n3. Ändere Snapshot-Namen...")
         print(f"   Neuer Name: '{new_name}'")
         
@@ -135,12 +196,9 @@ class SmartPlanningAPI:
         if current_comment:
             payload["comment"] = current_comment
         
-        response = requests.put(
+        response = self.session.put(
             url,
-            headers={
-                "Authorization": f"Bearer {self.token}",
-                "Content-Type": "application/json"
-            },
+            headers={"Content-Type": "application/json"},
             json=payload,
             verify=False,
             timeout=30
@@ -151,27 +209,7 @@ class SmartPlanningAPI:
             result = response.json()
             
             # WICHTIG: Aktualisiere auch metadata.txt im Storage!
-            storage = get_storage()
-            metadata_path = f"{snapshot_id}/metadata.txt"
-            
-            if storage.exists(metadata_path):
-                print(f"\n4. Aktualisiere metadata.txt im Storage...")
-                try:
-                    # Lese metadata.txt
-                    content = storage.load_text(metadata_path)
-                    
-                    # Finde JSON-Block und aktualisiere Name
-                    import re
-                    # Suche nach "name": "alter Name" und ersetze
-                    pattern = r'"name":\s*"[^"]*"'
-                    replacement = f'"name": "{new_name}"'
-                    updated_content = re.sub(pattern, replacement, content, count=1)
-                    
-                    # Schreibe zurück
-                    storage.save_text(metadata_path, updated_content)
-                    print(f"   ✓ metadata.txt aktualisiert")
-                except Exception as e:
-                    print(f"   ⚠ Warnung: Konnte metadata.txt nicht aktualisieren: {e}")
+            self._sync_metadata_name(snapshot_id, new_name)
             
             return result
         else:
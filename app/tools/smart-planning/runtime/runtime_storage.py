@@ -12,10 +12,12 @@ STORAGE_MODE is read from .env:
     STORAGE_MODE=AZURE  → reads/writes from Azure Blob Storage
 """
 
-import re
+import os
 import sys
+import time
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional, Set, Tuple
 
 # Add the application directory (app/) to sys.path so core.storage_manager resolves
 _demo_dir = str(Path(__file__).parents[3])
@@ -41,6 +43,69 @@ def get_storage() -> StorageManager:
     return _storage
 
 
+_ITERATION_PREFIX = "iteration-"
+
+
+def _parse_iteration_number(name: str) -> Optional[int]:
+    """
+    Returns N for a folder name "iteration-N", else None.
+    Cheap prefix check instead of a regex match on every directory entry / blob path.
+    """
+    if not name.startswith(_ITERATION_PREFIX):
+        return None
+    suffix = name[len(_ITERATION_PREFIX):]
+    return int(suffix) if suffix.isdecimal() else None
+
+
+# Coarsest common directory mtime granularity (FAT: 2 s). A folder changed more recently than
+# this may change again without a new mtime, so its listing is not served from the cache.
+_MTIME_SETTLE_NS = 2_000_000_000
+
+
+def _list_local_iterations(local_path: Path) -> Tuple[Tuple[int, str], ...]:
+    """
+    (iteration number, folder name) pairs of a local snapshot folder, sorted by number.
+    Cached per directory mtime and link count: creating, renaming or deleting an iteration
+    folder changes them, so repeated lookups within one run skip the listing. Folders
+    modified within the last _MTIME_SETTLE_NS are always listed fresh.
+    """
+    stat = local_path.stat()
+    key = (str(local_path), stat.st_mtime_ns, stat.st_nlink)
+    if time.time_ns() - stat.st_mtime_ns < _MTIME_SETTLE_NS:
+        return _list_local_iterations_cached.__wrapped__(*key)
+    return _list_local_iterations_cached(*key)
+
+
+@lru_cache(maxsize=128)
+def _list_local_iterations_cached(local_path: str, mtime_ns: int, nlink: int) -> Tuple[Tuple[int, str], ...]:
+    iterations = []
+    # scandir entries carry the file type, so is_dir() needs no extra stat per entry
+    with os.scandir(local_path) as entries:
+        for entry in entries:
+            num = _parse_iteration_number(entry.name)
+            if num is not None and entry.is_dir():
+                iterations.append((num, entry.name))
+    return tuple(sorted(iterations))
+
+
+def _scan_azure_iterations(storage: StorageManager, snapshot_id: str) -> Dict[int, Set[str]]:
+    """
+    Iteration number -> file names of that iteration, from a single blob listing.
+    Answers "which iterations exist" and "which contain file X" in the same pass.
+    """
+    iterations: Dict[int, Set[str]] = {}
+    for blob_path in storage.list_files(f"{snapshot_id}/"):
+        # blob_path format: "snapshot_id/iteration-2/file.json"
+        parts = blob_path.replace("\\", "/").split("/")
+        if len(parts) >= 2:
+            num = _parse_iteration_number(parts[1])
+            if num is not None:
+                files = iterations.setdefault(num, set())
+                if len(parts) >= 3:
+                    files.add(parts[2])
+    return iterations
+
+
 def get_iteration_folders(snapshot_id: str) -> List[int]:
     """
     Returns a sorted list of all iteration numbers that exist for a snapshot.
@@ -54,22 +119,10 @@ def get_iteration_folders(snapshot_id: str) -> List[int]:
     if storage.mode == "LOCAL":
         local_path = storage._get_local_path(snapshot_id)
         if local_path.exists():
-            for item in local_path.iterdir():
-                m = re.match(r'^iteration-(\d+)$', item.name)
-                if m and item.is_dir():
-                    iteration_numbers.append(int(m.group(1)))
+            iteration_numbers = [num for num, _ in _list_local_iterations(local_path)]
     else:
         # Azure: list blobs with prefix and extract iteration numbers
-        blobs = storage.list_files(f"{snapshot_id}/")
-        seen = set()
-        for blob_path in blobs:
-            # blob_path format: "snapshot_id/iteration-2/file.json"
-            parts = blob_path.replace("\\", "/").split("/")
-            if len(parts) >= 2:
-                m = re.match(r'^iteration-(\d+)$', parts[1])
-                if m:
-                    seen.add(int(m.group(1)))
-        iteration_numbers = list(seen)
+        iteration_numbers = list(_scan_azure_iterations(storage, snapshot_id))
 
     return sorted(iteration_numbers)
 
@@ -87,22 +140,14 @@ def get_iteration_folders_with_file(snapshot_id: str, filename: str) -> List[int
     if storage.mode == "LOCAL":
         local_path = storage._get_local_path(snapshot_id)
         if local_path.exists():
-            for item in local_path.iterdir():
-                m = re.match(r'^iteration-(\d+)$', item.name)
-                if m and item.is_dir() and (item / filename).exists():
-                    iteration_numbers.append(int(m.group(1)))
+            # The file check stays uncached: files inside an iteration folder do not touch
+            # the snapshot folder's mtime
+            iteration_numbers = [num for num, name in _list_local_iterations(local_path)
+                                 if (local_path / name / filename).exists()]
     else:
         # Azure: check if blobs with the specific file exist per iteration
-        blobs = storage.list_files(f"{snapshot_id}/")
-        seen = set()
-        for blob_path in blobs:
-            # Looking for: snapshot_id/iteration-N/filename
-            parts = blob_path.replace("\\", "/").split("/")
-            if len(parts) >= 3 and parts[2] == filename:
-                m = re.match(r'^iteration-(\d+)$', parts[1])
-                if m:
-                    seen.add(int(m.group(1)))
-        iteration_numbers = list(seen)
+        iteration_numbers = [num for num, files in _scan_azure_iterations(storage, snapshot_id).items()
+                             if filename in files]
 
     return sorted(iteration_numbers)
 